@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
-import sys, os, subprocess
+import errno, io, sys, os
+try:
+    from shutil import which
+except ImportError:
+    from distutils.spawn import find_executable as which
 
 from pkg_resources import get_distribution
 pkg_version = get_distribution('duco.ducobox').version
@@ -12,7 +16,6 @@ sys.path.append("src")
 
 extensions = [
     'sphinx.ext.autodoc',
-    'sphinx.ext.autosummary',
     'sphinx.ext.coverage',
     'sphinx.ext.doctest',
     'sphinx.ext.extlinks',
@@ -20,8 +23,23 @@ extensions = [
     'sphinx.ext.napoleon',
     'sphinx.ext.todo',
     'sphinx.ext.viewcode',
-    'sphinxcontrib.plantuml',
 ]
+
+
+def _uses_plantuml(docdir):
+    '''Check if any of the documents contains a plantuml directive'''
+    for root, _, files in os.walk(docdir):
+        for name in files:
+            if name.endswith('.rst'):
+                with io.open(os.path.join(root, name), encoding='utf-8') as rstfile:
+                    if '.. uml::' in rstfile.read():
+                        return True
+    return False
+
+
+use_plantuml = _uses_plantuml(os.path.dirname(os.path.abspath(__file__)))
+if use_plantuml:
+    extensions += 'sphinxcontrib.plantuml',
 if os.getenv('SPELLCHECK'):
     extensions += 'sphinxcontrib.spelling',
     spelling_show_suggestions = True
@@ -60,24 +78,40 @@ napoleon_use_ivar = True
 napoleon_use_rtype = False
 napoleon_use_param = False
 
+
 # Point to plantuml jar file
+def _lookup_plantuml():
+    '''
+    Search plantuml on the PATH
+
+    The jar file is searched by name, as it is neither executable nor has an extension from PATHEXT.
+    Otherwise the plantuml wrapper script is used.
+    '''
+    for directory in os.environ.get('PATH', '').split(os.pathsep):
+        path = os.path.join(directory, 'plantuml.jar')
+        if directory and os.path.isfile(path):
+            return path
+    return which('plantuml')
+
+
+def _resolve_plantuml():
+    '''
+    Get the path to plantuml
+
+    The PLANTUML_JAR environment variable takes precedence, otherwise the PATH gets searched.
+    '''
+    path = os.getenv('PLANTUML_JAR')
+    if path and os.path.exists(path):
+        return path
+    return _lookup_plantuml()
+
+
 # confirm we have plantuml in the path
-if 'nt' in os.name:
-    plantuml_path = subprocess.check_output(["where", "/F", "plantuml.jar"])
-    if not plantuml_path :
-        print("Can't find 'plantuml.jar' file.")
-        print("You need to add path to 'plantuml.jar' file to your PATH variable.")
-        sys.exit(os.strerror(errno.EPERM))
-    plantuml = plantuml_path.decode("utf-8")
-    plantuml = plantuml.rstrip('\n\r')
-    plantuml = plantuml.replace('"', '')
-    plantuml = plantuml.replace('\\', '//')
-    plantuml = 'java -jar' + ' ' + plantuml
-else:
-    plantuml_path = subprocess.check_output(["whereis", "-u", "plantuml"])
-    if not plantuml_path :
+if use_plantuml:
+    plantuml_path = _resolve_plantuml()
+    if not plantuml_path:
         print("Can't find 'plantuml.jar' file.")
         print("You need to add path to 'plantuml.jar' file to your PATH variable.")
         sys.exit(os.strerror(errno.EPERM))
-
-
+    if plantuml_path.endswith('.jar'):
+        plantuml = 'java -jar' + ' ' + plantuml_path.replace('\\', '//')
@@ -1,11 +1,17 @@
-from glob import glob
-from os.path import basename, splitext
+import io
 
 from setuptools import find_packages, setup
 
 PROJECT_URL = 'https://github.com/SteinHeselmans/DucoBox'
 
-requires = ['setuptools-scm', 'pyserial', 'influxdb']
+requires = ['pyserial', 'influxdb']
+
+
+def read(filename):
+    '''Read a UTF-8 encoded file from the source tree'''
+    with io.open(filename, 'rb') as infile:
+        return infile.read().decode('utf-8')
+
 
 setup(
     name='duco.ducobox',
@@ -17,14 +23,13 @@ setup(
     author='Stein Heselmans',
     author_email='stein.heselmans@gmail.com',
     description='Read parameters from DucoBox.',
-    long_description=open("README.rst").read(),
+    long_description=read('README.rst'),
     zip_safe=False,
     license='GNU General Public License v3 (GPLv3)',
     platforms='any',
     packages=find_packages('src'),
     package_dir={'': 'src'},
     entry_points={'console_scripts': ['ducobox = duco.ducobox:main']},
-    py_modules=[splitext(basename(path))[0] for path in glob('src/*.py')],
     include_package_data=True,
     install_requires=requires,
     namespace_packages=['duco'],
@@ -6,24 +6,46 @@ try:
     from configparser import ConfigParser, NoSectionError, NoOptionError
 except ImportError:
     from ConfigParser import ConfigParser, NoSectionError, NoOptionError
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+import os
 import sys
 import re
 import logging
 import time
-from serial import Serial, SerialException
+import threading
+from serial import Serial, SerialException, SerialTimeoutException
 from influxdb import InfluxDBClient
 from influxdb.exceptions import InfluxDBServerError
 
 try:
-    from .__ducobox_version__ import version as ducobox_version
+    from .__ducobox_version__ import version as __version__
 except ImportError:
-    ducobox_version = 'version not available from scm'
+    __version__ = 'version not available from scm'
+
+# time.monotonic is not available on python 2
+monotonic = getattr(time, 'monotonic', time.time)
 
-__version__ = ducobox_version
+# A port that disappears (e.g. an unplugged USB adapter) can fail with OS level errors, which pyserial
+# does not wrap in a SerialException. termios is only available on POSIX platforms.
+try:
+    from termios import error as TermiosError
+    SERIAL_ERRORS = (SerialException, OSError, IOError, TermiosError)
+except ImportError:
+    SERIAL_ERRORS = (SerialException, OSError, IOError)
 
 DEFAULT_LOGLEVEL = 'info'
 DEFAULT_INTERVAL = 300
-SERIAL_CHAR_INTERVAL = 0.001
+DEFAULT_STARTUP_TIMEOUT = 60
+SERIAL_EOL = b'\r'
+SERIAL_PROMPT = b'>'
+SERIAL_TIMEOUT = 0.1
+SERIAL_REPLY_TIMEOUT = 5
+SERIAL_WRITE_TIMEOUT = 1
+SERIAL_RETRY_INTERVAL = 1
+SERIAL_RETRY_MAX_INTERVAL = 300
 
 CO2_STR = 'CO2'
 HUMIDITY_STR = 'humidity'
@@ -44,6 +66,8 @@ CO2_SCALING = 1
 TEMPERATURE_SCALING = 10.0
 FANSPEED_SCALING = 1.0
 
+BOOLEAN_TRUE_STATES = ('1', 'yes', 'true', 'on')
+
 
 def set_logging_level(loglevel):
     '''
@@ -56,11 +80,15 @@ def set_logging_level(loglevel):
     if not isinstance(numeric_level, int):
         raise ValueError('Invalid log level: %s' % loglevel)
     logging.basicConfig(level=numeric_level, format='%(message)s')
+    # basicConfig does nothing when logging was configured before
+    logging.getLogger().setLevel(numeric_level)
 
 
 class DucoNodeParameter(object):
     '''Class for holding a parameter for Duco Nodes'''
 
+    __slots__ = ('name', 'unit', 'scaling', 'value')
+
     def __init__(self, name, unit='', scaling=1.0):
         '''
         Initializer for a node parameter
@@ -85,7 +113,7 @@ class DucoNodeParameter(object):
             float: Scaled floating point value for the given value
         '''
         self.value = float(value) / self.scaling
-        logging.info('    - {msg}: {value} {unit}'.format(msg=self.name, value=self.value, unit=self.unit))
+        logging.info('    - %s: %s %s', self.name, self.value, self.unit)
         return self.value
 
     def get_value(self):
@@ -104,12 +132,14 @@ class DucoNodeParameter(object):
         Returns:
             str: String representation of the object
         '''
-        return '{value} {unit}'.format(value=self.value, unit=self.unit, address=self.address)
+        return '{value} {unit}'.format(value=self.value, unit=self.unit)
 
 
 class DucoNodeFanSpeed(DucoNodeParameter):
     '''Class for holding a fan speed parameter for Duco Nodes'''
 
+    __slots__ = ()
+
     def __init__(self):
         '''Initializer for a fan speed parameter'''
         super(DucoNodeFanSpeed, self).__init__('fanspeed', FANSPEED_UNIT, FANSPEED_SCALING)
@@ -118,6 +148,8 @@ class DucoNodeFanSpeed(DucoNodeParameter):
 class DucoNodeParaGetParameter(DucoNodeParameter):
     '''Class for holding a parameter for Duco Nodes, that can be retrieved through the nodeparaget command'''
 
+    __slots__ = ('getter_id',)
+
     def __init__(self, name, unit, scaling, getter_id):
         '''
         Initializer for a node parameter
@@ -135,6 +167,8 @@ class DucoNodeParaGetParameter(DucoNodeParameter):
 class DucoNodeHumidityParaGet(DucoNodeParaGetParameter):
     '''Class for holding a humidity-paraget parameter for Duco Nodes'''
 
+    __slots__ = ()
+
     def __init__(self):
         '''Initializer for a humidity parameter'''
         super(DucoNodeHumidityParaGet, self).__init__('humidity', HUMIDITY_UNIT, HUMIDITY_SCALING,
@@ -144,6 +178,8 @@ class DucoNodeHumidityParaGet(DucoNodeParaGetParameter):
 class DucoNodeCO2ParaGet(DucoNodeParaGetParameter):
     '''Class for holding a CO2-paraget parameter for Duco Nodes'''
 
+    __slots__ = ()
+
     def __init__(self):
         '''Initializer for a CO2 parameter'''
         super(DucoNodeCO2ParaGet, self).__init__('CO2', CO2_UNIT, CO2_SCALING, CO2_PARAGET_ID)
@@ -152,6 +188,8 @@ class DucoNodeCO2ParaGet(DucoNodeParaGetParameter):
 class DucoNodeTemperatureParaGet(DucoNodeParaGetParameter):
     '''Class for holding a temperature-paraget parameter for Duco Nodes'''
 
+    __slots__ = ()
+
     def __init__(self):
         '''Initializer for a temperature parameter'''
         super(DucoNodeTemperatureParaGet, self).__init__('temperature', TEMPERATURE_UNIT, TEMPERATURE_SCALING,
@@ -161,10 +199,12 @@ class DucoNodeTemperatureParaGet(DucoNodeParaGetParameter):
 class DucoNode(object):
     '''Class for holding a DucoNode object: a generic device in the Duco network'''
 
+    __slots__ = ('number', 'address', 'name', 'blacklist', 'parameters', 'interface')
+
     KIND = None
     SENSOR_INFO_COMMAND = r'sensorinfo'
     PARAGET_COMMAND = r'nodeparaget {node} {para}'
-    PARAGET_REGEX = r'-->\s*(?P<value>\d+)'
+    PARAGET_REGEX = re.compile(r'-->\s*(?P<value>\d+)')
 
     def __init__(self, number, address, interface=None):
         '''
@@ -181,7 +221,7 @@ class DucoNode(object):
         self.blacklist = False
         self.parameters = {}
         self.bind_serial(interface)
-        logging.info('Found node {node} at {address} ({name})'.format(node=self.number, address=self.address, name=self.name))
+        logging.info('Found node %s at %s (%s)', self.number, self.address, self.name)
 
     def bind_serial(self, interface):
         '''
@@ -212,8 +252,34 @@ class DucoNode(object):
         Args:
             other (DucoNode): Other object to compare for equality
         '''
+        if not isinstance(other, DucoNode):
+            return NotImplemented
         return self.address == other.address
 
+    def __ne__(self, other):
+        '''
+        Not equal operator, needed on python 2 where it is not derived from the equal operator
+
+        Args:
+            other (DucoNode): Other object to compare for inequality
+        '''
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    def __hash__(self):
+        '''
+        Hash operator, consistent with the equal operator
+
+        The hash follows the address, which loading the network configuration can change. Nodes must
+        therefore not be put in a set, or used as a dict key, before DucoInterface.load().
+
+        Returns:
+            int: Hash of the address of the node
+        '''
+        return hash(self.address)
+
     def _store(self, cfgparser):
         '''
         Store Node to given network configuration file
@@ -223,27 +289,40 @@ class DucoNode(object):
         '''
         section = 'Node{number}'.format(number=self.number)
         cfgparser.add_section(section)
-        cfgparser.set(section, 'name', self.name)
-        cfgparser.set(section, 'number', self.number)
-        cfgparser.set(section, 'address', self.address)
-        cfgparser.set(section, 'blacklist', self.blacklist)
+        for option, value in self._store_options():
+            cfgparser.set(section, option, value)
+
+    def _store_options(self):
+        '''
+        Get the options to store for the Node in the network configuration file
+
+        Returns:
+            list: Tuples of option name and its string value, in storage order
+        '''
+        return [
+            ('name', self.name),
+            ('number', self.number),
+            ('address', self.address),
+            ('blacklist', str(self.blacklist)),
+        ]
 
-    def _load(self, cfgparser):
+    def _load(self, configuration):
         '''
-        Load Node from given network configuration file
+        Load Node from given network configuration
 
         Args:
-            cfgparser (ConfigParser): Configuration object to load the Node from
+            configuration (dict): Options of the network configuration file, per section
         '''
         section = 'Node{number}'.format(number=self.number)
         try:
-            self.name = cfgparser.get(section, 'name')
-            self.number = cfgparser.get(section, 'number')
-            self.address = cfgparser.get(section, 'address')
-            self.blacklist = cfgparser.getboolean(section, 'blacklist')
-            logging.info('Node {number} ({name}) found in network configuration file at address {address}'.format(number=self.number, name=self.name, address=self.address))
-        except (NoSectionError, NoOptionError):
-            logging.info('Node {number} not found in network configuration file, adding...'.format(number=self.number))
+            options = configuration[section]
+            self.name = options['name']
+            self.number = options['number']
+            self.address = options['address']
+            self.blacklist = options['blacklist'].lower() in BOOLEAN_TRUE_STATES
+            logging.info('Node %s (%s) found in network configuration file at address %s', self.number, self.name, self.address)
+        except KeyError:
+            logging.info('Node %s not found in network configuration file, adding...', self.number)
 
     def sample(self):
         '''
@@ -251,7 +330,7 @@ class DucoNode(object):
         '''
         if not self.blacklist:
             if self.interface:
-                logging.info('  - {name}'.format(name=self.name))
+                logging.info('  - %s', self.name)
                 self._perform_sample()
             else:
                 logging.error('No interface to duco')
@@ -259,12 +338,18 @@ class DucoNode(object):
     def _perform_sample(self):
         '''
         Take a sample from the DucoNode and store it
-        '''
-        for name in self.parameters:
-            parameter = self.parameters[name]
-            cmd = self.PARAGET_COMMAND.format(node=self.number, para=parameter.getter_id)
-            reply = self.interface.execute_command(cmd)
-            value = self._parse_reply(reply, self.PARAGET_REGEX, 'value', unit=parameter.unit, scaling=parameter.scaling)
+
+        The nodeparaget commands for all parameters are sent as one series, so the interface is woken up only once.
+        '''
+        parameters = list(self.parameters.items())
+        if not parameters:
+            return
+        commands = [self.PARAGET_COMMAND.format(node=self.number, para=parameter.getter_id)
+                    for name, parameter in parameters]
+        replies = self.interface.execute_commands(commands)
+        pattern = self.PARAGET_REGEX
+        for (name, parameter), reply in zip(parameters, replies):
+            value = self._parse_reply(reply, pattern, 'value', unit=parameter.unit, scaling=parameter.scaling)
             self.set_value(name, value)
 
     def set_value(self, parameter, value):
@@ -299,13 +384,13 @@ class DucoNode(object):
         '''
         return '{name} ({number}) @ {address}'.format(name=self.name, number=self.number, address=self.address)
 
-    def _parse_reply(self, reply, regex, group, scaling=None, unit=''):
+    def _parse_reply(self, reply, pattern, group, scaling=None, unit=''):
         '''
         Parse the reply on a command
 
         Args:
             reply (str): The reply from the duco interface on your command
-            regex (str): Regular expression to get the data from the reply
+            pattern (Pattern): Compiled regular expression to get the data from the reply
             group (str): Named group within the regex to get the data from the reply
             scaling (float): Dividing factor for rescaling parsed value
             unit (str): Unit of the sampled information
@@ -313,25 +398,47 @@ class DucoNode(object):
         Returns:
             String with parsed value from reply, if regex matched. None otherwise.
         '''
-        match = re.compile(regex).search(reply)
+        match = pattern.search(reply)
         if match:
             return match.group(group)
         return None
 
+    def _parse_reply_groups(self, reply, pattern):
+        '''
+        Parse all named groups of a pattern from the reply on a command, in a single scan
+
+        The pattern is typically an alternation, where every alternative holds one named group.
+
+        Args:
+            reply (str): The reply from the duco interface on your command
+            pattern (Pattern): Compiled regular expression to get the data from the reply
+
+        Returns:
+            dict: Parsed value from the first match for each of the named groups that matched
+        '''
+        values = {}
+        for match in pattern.finditer(reply):
+            for group, value in match.groupdict().items():
+                if value is not None and group not in values:
+                    values[group] = value
+        return values
+
 
 class DucoBox(DucoNode):
     '''Class for a Duco box device'''
 
+    __slots__ = ('boot_software', 'serial', 'board_name', 'board_type', 'device_id')
+
     KIND = 'BOX'
 
     FAN_SPEED_COMMAND = r'fanspeed'
-    MATCH_FAN_SPEED = r'Actual\s*(?P<actual>\d+).*Filtered\s*(?P<filtered>\d+)'
+    MATCH_FAN_SPEED = re.compile(r'Actual\s*(?P<actual>\d+).*?Filtered\s*(?P<filtered>\d+)')
     BOARD_INFO_COMMAND = r'boardinfo'
-    MATCH_BOOT_SOFTWARE = r'BootSW\s*:\s*(?P<bootsw>.+)'
-    MATCH_SERIAL = r'Serial\s*:\s*(?P<serial>.+)'
-    MATCH_BOARD_NAME = r'Board\s*:\s*(?P<board>.+)'
-    MATCH_BOARD_TYPE = r'Type\s*:\s*(?P<type>.+)'
-    MATCH_DEVICE_ID = r'DevId\s*:\s*(?P<deviceid>.+)'
+    MATCH_BOARD_INFO = re.compile(r'BootSW\s*:\s*(?P<bootsw>.+)'
+                                  r'|Serial\s*:\s*(?P<serial>.+)'
+                                  r'|Board\s*:\s*(?P<board>.+)'
+                                  r'|Type\s*:\s*(?P<type>.+)'
+                                  r'|DevId\s*:\s*(?P<deviceid>.+)')
 
     def __init__(self, number, address, interface=None):
         '''
@@ -358,11 +465,12 @@ class DucoBox(DucoNode):
         if self.interface:
             logging.info('Getting board information...')
             reply = self.interface.execute_command(self.BOARD_INFO_COMMAND)
-            self.boot_software = self._parse_reply(reply, self.MATCH_BOOT_SOFTWARE, 'bootsw')
-            self.serial = self._parse_reply(reply, self.MATCH_SERIAL, 'serial')
-            self.board_name = self._parse_reply(reply, self.MATCH_BOARD_NAME, 'board')
-            self.board_type = self._parse_reply(reply, self.MATCH_BOARD_TYPE, 'type')
-            self.device_id = self._parse_reply(reply, self.MATCH_DEVICE_ID, 'deviceid')
+            values = self._parse_reply_groups(reply, self.MATCH_BOARD_INFO)
+            self.boot_software = values.get('bootsw')
+            self.serial = values.get('serial')
+            self.board_name = values.get('board')
+            self.board_type = values.get('type')
+            self.device_id = values.get('deviceid')
             if self.board_name and "BASIC" not in self.board_name:
                 self.interface.set_extended()
         else:
@@ -380,6 +488,8 @@ class DucoBox(DucoNode):
 class DucoNodeWithTemperature(DucoNode):
     '''Class for a duco node with temperature sensing'''
 
+    __slots__ = ()
+
     def __init__(self, number, address, interface=None):
         '''
         Initializer for a temperature sensor inside the Duco box
@@ -390,13 +500,14 @@ class DucoNodeWithTemperature(DucoNode):
             interface (DucoInterface): Interface object to use when executing commands
         '''
         super(DucoNodeWithTemperature, self).__init__(number, address, interface)
-        self.temperature = None
         self.parameters[TEMPERATURE_STR] = DucoNodeTemperatureParaGet()
 
 
 class DucoNodeWithHumidity(DucoNode):
     '''Class for a duco node with humidity sensing'''
 
+    __slots__ = ()
+
     def __init__(self, number, address, interface=None):
         '''
         Initializer for a humidity sensor inside the Duco box
@@ -407,13 +518,14 @@ class DucoNodeWithHumidity(DucoNode):
             interface (DucoInterface): Interface object to use when executing commands
         '''
         super(DucoNodeWithHumidity, self).__init__(number, address, interface)
-        self.humidity = None
         self.parameters[HUMIDITY_STR] = DucoNodeHumidityParaGet()
 
 
 class DucoNodeWithCO2(DucoNode):
     '''Class for a duco node with CO2 sensing'''
 
+    __slots__ = ()
+
     def __init__(self, number, address, interface=None):
         '''
         Initializer for a CO2 sensor inside the Duco box
@@ -424,29 +536,33 @@ class DucoNodeWithCO2(DucoNode):
             interface (DucoInterface): Interface object to use when executing commands
         '''
         super(DucoNodeWithCO2, self).__init__(number, address, interface)
-        self.co2 = None
         self.parameters[CO2_STR] = DucoNodeCO2ParaGet()
 
 
 class DucoUserControl(DucoNode):
     '''Class for a user control device inside the Duco box network'''
 
+    __slots__ = ()
+
     KIND = 'UC'
 
 
 class DucoUserControlBattery(DucoUserControl):
     '''Class for a user control with battery inside the Duco box network'''
 
+    __slots__ = ()
+
     KIND = 'UCBAT'
 
 
 class DucoUserControlHumiditySensor(DucoUserControl, DucoNodeWithHumidity, DucoNodeWithTemperature):
     '''Class for a user control with a humidity sensor inside the Duco box network'''
 
+    __slots__ = ()
+
     KIND = 'UCRH'
 
-    MATCH_SENSOR_INFO_HUMIDITY = r'RH\s*\:\s*(?P<humidity>\d+)'
-    MATCH_SENSOR_INFO_TEMPERATURE = r'TEMP\s*\:\s*(?P<temperature>\d+)'
+    MATCH_SENSOR_INFO = re.compile(r'RH\s*\:\s*(?P<humidity>\d+)|TEMP\s*\:\s*(?P<temperature>\d+)')
 
     def _perform_sample(self):
         '''
@@ -456,50 +572,62 @@ class DucoUserControlHumiditySensor(DucoUserControl, DucoNodeWithHumidity, DucoN
             super(DucoUserControlHumiditySensor, self)._perform_sample()
         else:
             reply = self.interface.execute_command(self.SENSOR_INFO_COMMAND)
-            humidity = self._parse_reply(reply, self.MATCH_SENSOR_INFO_HUMIDITY, 'humidity',
-                                         unit=HUMIDITY_UNIT, scaling=HUMIDITY_SCALING)
-            self.set_value(HUMIDITY_STR, humidity)
-            temperature = self._parse_reply(reply, self.MATCH_SENSOR_INFO_TEMPERATURE,
-                                            'temperature', unit=TEMPERATURE_UNIT, scaling=TEMPERATURE_SCALING)
-            self.set_value(TEMPERATURE_STR, temperature)
+            values = self._parse_reply_groups(reply, self.MATCH_SENSOR_INFO)
+            self.set_value(HUMIDITY_STR, values.get('humidity'))
+            self.set_value(TEMPERATURE_STR, values.get('temperature'))
 
 
 class DucoUserControlCO2Sensor(DucoNodeWithCO2, DucoNodeWithTemperature):
     '''Class for a user control with a CO2 sensor inside the Duco box network'''
 
+    __slots__ = ()
+
     KIND = 'UCCO2'
 
 
 class DucoValve(DucoNode):
     '''Class for a valve device inside the Duco box network'''
 
+    __slots__ = ()
+
     KIND = 'VLV'
 
 
 class DucoValveHumiditySensor(DucoNodeWithHumidity, DucoNodeWithTemperature):
     '''Class for a valve with a humidity sensor inside the Duco box network'''
 
+    __slots__ = ()
+
     KIND = 'VLVRH'
 
 
 class DucoValveCO2Sensor(DucoNodeWithCO2, DucoNodeWithTemperature):
     '''Class for a valve with a CO2 sensor inside the Duco box network'''
 
+    __slots__ = ()
+
     KIND = 'VLVCO2'
 
 
 class DucoSwitch(DucoNode):
     '''Class for a switch inside the Duco box network'''
 
+    __slots__ = ()
+
     KIND = 'SWITCH'
 
 
 class DucoGrille(DucoNodeWithTemperature):
     '''Class for a 'Tronic' ventilation grille with motor and temperature sensor inside the Duco box network'''
 
+    __slots__ = ()
+
     KIND = 'CLIMA'
 
 
+NODE_CLASSES = dict((cls.KIND, cls) for cls in DucoNode.get_subclasses() if cls.KIND)
+
+
 class DucoDatabase(object):
     '''
     Class for a generic database where we want to store the samples from our ducobox
@@ -519,6 +647,12 @@ class DucoDatabase(object):
         '''
         pass
 
+    def flush(self):
+        '''
+        Write out the samples which were stored since the previous flush
+        '''
+        pass
+
 
 class InfluxDb(DucoDatabase):
     '''
@@ -533,6 +667,7 @@ class InfluxDb(DucoDatabase):
             cfgfile (str): Configuration file for connection to influxdb
         '''
         super(InfluxDb, self).__init__()
+        self._pending = []
         try:
             cfgparser = ConfigParser()
             cfgparser.read(cfgfile)
@@ -542,10 +677,10 @@ class InfluxDb(DucoDatabase):
             user = cfgparser.get(section, 'user')
             password = cfgparser.get(section, 'password')
             dbname = cfgparser.get(section, 'database')
-            logging.info('InfluxDB connection to {url}:{port}, {name}'.format(url=url, port=port, name=dbname))
+            logging.info('InfluxDB connection to %s:%s, %s', url, port, dbname)
             self.configure(url, port, user, password, dbname)
         except (NoSectionError, NoOptionError):
-            logging.warning('InfluxDB configuration file {file} incomplete'.format(file=cfgfile))
+            logging.warning('InfluxDB configuration file %s incomplete', cfgfile)
 
     def configure(self, url, port, user, password, dbname):
         '''
@@ -566,13 +701,15 @@ class InfluxDb(DucoDatabase):
         '''
         Store a sample in the database
 
+        The sample is only written to the database on the next flush.
+
         Args:
             node (DucoNode): Node for which to store the sample
             measurement (str): Parameter to store
             value (float): Scaled value to store in database
         '''
         super(InfluxDb, self).store_sample(node, measurement, value)
-        json_data = [
+        self._pending.append(
             {
                 "measurement": measurement,
                 "tags":
@@ -585,18 +722,27 @@ class InfluxDb(DucoDatabase):
                         "value": value
                     }
             }
-        ]
-        try:
-            self.database.write_points(json_data)
-        except InfluxDBServerError:
-            logging.warning('Could not write to influxDB')
+        )
+
+    def flush(self):
+        '''
+        Write out the samples which were stored since the previous flush, in a single request
+        '''
+        super(InfluxDb, self).flush()
+        if self._pending:
+            json_data, self._pending = self._pending, []
+            try:
+                self.database.write_points(json_data)
+            except InfluxDBServerError:
+                logging.warning('Could not write to influxDB')
 
 
 class DucoInterface(object):
     '''Class for interfacing with Duco devices'''
 
     LIST_NETWORK_COMMAND = r'network'
-    MATCH_NETWORK_COMMAND = r'^\s*(?P<node>\d+)\s*\|\s*(?P<address>\d+)\s*\|\s*(?P<kind>\w+).*$'
+    MATCH_NETWORK_COMMAND = re.compile(r'^\s*(?P<node>\d+)\s*\|\s*(?P<address>\d+)\s*\|\s*(?P<kind>\w+)', re.MULTILINE)
+    MATCH_PROMPT = re.compile(br'(?:^|[\r\n]+)>\s*\Z')
 
     def __init__(self, port='/dev/ttyUSB0', cfgfile=None):
         '''
@@ -607,11 +753,13 @@ class DucoInterface(object):
             cfgfile (str): Name of the network configuration file
         '''
         logging.info('Welcome to Duco Interface')
-        self._serial = None
         self._database = None
         self.nodes = []
+        self._nodes_by_number = {}
         self.bind_serial(port)
         self.cfgfile = cfgfile
+        self._cfg_snapshot = None
+        self._cfg_stat = None
         self._live = False
         self._extended = False
 
@@ -649,15 +797,26 @@ class DucoInterface(object):
     def store(self):
         '''
         Store to network configuration file
+
+        The file is only written when its content differs from the configuration to store.
         '''
         if self.cfgfile:
-            with open(self.cfgfile, 'w') as cfgfile:
-                logging.info('Storing network configuration...')
-                cfgparser = ConfigParser()
-                for node in self.nodes:
-                    node._store(cfgparser)
-                cfgparser.write(cfgfile)
-                logging.debug('Store finished')
+            cfgparser = ConfigParser()
+            for node in self.nodes:
+                node._store(cfgparser)
+            buf = StringIO()
+            cfgparser.write(buf)
+            content = buf.getvalue()
+            if content == self._read_cfgfile():
+                logging.debug('Network configuration unchanged, not storing')
+            else:
+                with open(self.cfgfile, 'w') as cfgfile:
+                    logging.info('Storing network configuration...')
+                    cfgfile.write(content)
+                    logging.debug('Store finished')
+            self._cfg_stat = self._stat_cfgfile()
+            if self._cfg_stat is not None:
+                self._cfg_snapshot = self._snapshot(cfgparser)
         else:
             logging.warning('Not storing: no network configuration file given')
 
@@ -666,24 +825,118 @@ class DucoInterface(object):
         Load from network configuration file
         '''
         logging.info('Loading network configuration...')
-        cfgparser = ConfigParser()
-        cfgparser.read(self.cfgfile)
+        cfg_stat = self._stat_cfgfile()
+        if cfg_stat is None or cfg_stat != self._cfg_stat:
+            cfgparser = ConfigParser()
+            cfgparser.read(self.cfgfile)
+            self._cfg_snapshot = self._snapshot(cfgparser)
+            self._cfg_stat = cfg_stat
+        else:
+            logging.debug('Network configuration file unchanged, not parsing')
         for node in self.nodes:
-            node._load(cfgparser)
+            node._load(self._cfg_snapshot)
+        # Loading can renumber nodes
+        self._index_nodes()
         logging.debug('Load finished')
 
+    def _read_cfgfile(self):
+        '''
+        Get the content of the network configuration file
+
+        Returns:
+            str: Content of the file, or None if the file cannot be read
+        '''
+        try:
+            with open(self.cfgfile) as cfgfile:
+                return cfgfile.read()
+        except (IOError, OSError):
+            return None
+
+    def _stat_cfgfile(self):
+        '''
+        Get the modification time and size of the network configuration file
+
+        Returns:
+            tuple: Modification time and size of the file, or None if the file cannot be accessed
+        '''
+        try:
+            cfg_stat = os.stat(self.cfgfile)
+        except (OSError, TypeError):
+            return None
+        return (cfg_stat.st_mtime, cfg_stat.st_size)
+
+    @staticmethod
+    def _snapshot(cfgparser):
+        '''
+        Get the options per section of a network configuration
+
+        Args:
+            cfgparser (ConfigParser): Parsed network configuration
+        Returns:
+            dict: Options (dict) of the network configuration, per section
+        '''
+        return dict((section, dict(cfgparser.items(section))) for section in cfgparser.sections())
+
     def bind_serial(self, port):
         '''
-        Bind serial port: configure and open serial port at 115200 in 8N1 mode
+        Bind serial port: the port gets configured and opened at 115200 in 8N1 mode on first use
 
         Args:
             port (str): Name of the serial port
         '''
+        self._port = port
+        self._serial = None
+        self._serial_retry_at = None
+        self._serial_retry_interval = SERIAL_RETRY_INTERVAL
+        self._serial_lock = threading.Lock()
+
+    def _open_serial(self):
+        '''
+        Open the bound serial port, if not done before
+
+        When opening fails, it is retried on later use, after a delay that doubles on every failure.
+
+        Returns:
+            Serial: The opened serial port, or None when it could not be opened
+        '''
+        if self._serial is None and (self._serial_retry_at is None or monotonic() >= self._serial_retry_at):
+            try:
+                self._serial = Serial(port=self._port, baudrate=115200, timeout=SERIAL_TIMEOUT,
+                                      write_timeout=SERIAL_WRITE_TIMEOUT)
+                logging.info('Opened serial port %s', self._port)
+                self._set_low_latency()
+                self._serial_retry_at = None
+                self._serial_retry_interval = SERIAL_RETRY_INTERVAL
+            except SERIAL_ERRORS:
+                logging.error('Could not open %s, continuing in offline mode, retrying in %s s',
+                              self._port, self._serial_retry_interval)
+                self._serial_retry_at = monotonic() + self._serial_retry_interval
+                self._serial_retry_interval = min(2 * self._serial_retry_interval, SERIAL_RETRY_MAX_INTERVAL)
+        return self._serial
+
+    def _close_serial(self):
+        '''
+        Close the serial port after a failure, so it gets opened again on next use
+        '''
+        logging.error('Serial port %s failed, reopening it on next use', self._port)
         try:
-            self._serial = Serial(port=port, baudrate=115200, timeout=0.1)
-        except SerialException:
-            logging.error('Could not open {port}, continuing in offline mode'.format(port=port))
-        logging.info('Opened serial port {port}'.format(port=port))
+            self._serial.close()
+        except SERIAL_ERRORS:
+            pass
+        self._serial = None
+
+    def _set_low_latency(self):
+        '''
+        Put the opened serial port in low latency mode, if the platform and driver support it
+
+        USB serial adapters otherwise buffer received data for several milliseconds before handing it over.
+        '''
+        set_low_latency_mode = getattr(self._serial, 'set_low_latency_mode', None)
+        if set_low_latency_mode is not None:
+            try:
+                set_low_latency_mode(True)
+            except (ValueError, IOError, NotImplementedError):
+                logging.debug('Low latency mode not supported on %s', self._port)
 
     def bind_database(self, db):
         '''
@@ -715,22 +968,100 @@ class DucoInterface(object):
         Returns:
             str: Received answer
         '''
-        logging.debug('Serial command:\n{command}'.format(command=command))
         reply = ''
-        if self._serial:
-            self._serial.write('\r'.encode())
-            time.sleep(SERIAL_CHAR_INTERVAL)
-            self._serial.readline()
-            cmd = command.encode('utf-8')
-            for c in cmd:
-                time.sleep(SERIAL_CHAR_INTERVAL)
-                self._serial.write(c)
-            time.sleep(SERIAL_CHAR_INTERVAL)
-            self._serial.write('\r'.encode())
-            reply = str(self._serial.readline()).replace('\r', '\n')
-            logging.debug('Serial reply:\n{reply}'.format(reply=reply))
-        else:
-            logging.warning('No serial device')
+        with self._serial_lock:
+            if self._open_serial():
+                try:
+                    self._wake_up()
+                    reply = self._transfer(command)
+                except SERIAL_ERRORS:
+                    self._close_serial()
+            else:
+                logging.warning('No serial device')
+        return reply
+
+    def execute_commands(self, commands):
+        '''
+        Execute a series of commands: send the commands one by one, and return the replies
+
+        The interface is woken up only once for the whole series, instead of once per command. The serial
+        port stays reserved until the whole series is done.
+
+        Args:
+            commands (iterable): Commands (str) to send to the serial port
+        Returns:
+            list: Received answers (str), for each of the commands in order. Shorter when the serial port fails.
+        '''
+        replies = []
+        with self._serial_lock:
+            if self._open_serial():
+                try:
+                    self._wake_up()
+                    for command in commands:
+                        replies.append(self._transfer(command))
+                except SERIAL_ERRORS:
+                    self._close_serial()
+            else:
+                logging.warning('No serial device')
+        return replies
+
+    def _wake_up(self):
+        '''
+        Wake up the serial interface: drop stale input, send an empty line and flush the prompt
+        '''
+        self._serial.reset_input_buffer()
+        self._serial.write(SERIAL_EOL)
+        self._read_reply()
+
+    def _read_reply(self):
+        '''
+        Read from the serial interface until the prompt reappears
+
+        The timeout of the serial port limits a single read to what arrives within SERIAL_TIMEOUT, which is
+        shorter than a large reply (like the network list) takes at 115200 baud. Reading therefore goes on
+        until the prompt is received, or SERIAL_REPLY_TIMEOUT has passed. The prompt is a '>' at the start of
+        a line, followed by nothing but whitespace: a '>' inside a reply (like '-->') does not end the read.
+
+        Returns:
+            bytes: Received data, including the prompt if it was received
+        '''
+        deadline = monotonic() + SERIAL_REPLY_TIMEOUT
+        reply = self._serial.read_until(SERIAL_PROMPT)
+        while not self.MATCH_PROMPT.search(reply):
+            if monotonic() >= deadline:
+                logging.warning('No prompt received from %s within %s s, reply may be incomplete',
+                                self._port, SERIAL_REPLY_TIMEOUT)
+                break
+            reply += self._serial.read_until(SERIAL_PROMPT)
+        return reply
+
+    def _transfer(self, command):
+        '''
+        Send a single command to the woken up serial interface, and return the reply
+
+        Args:
+            command (str): Command to send to the serial port, bytes are sent as is
+        Returns:
+            str: Received answer without the prompt, empty when the command could not be sent
+        '''
+        logging.debug('Serial command:\n%s', command)
+        if not isinstance(command, bytes):
+            command = command.encode('ascii')
+        payload = command + SERIAL_EOL
+        try:
+            written = self._serial.write(payload)
+            self._serial.flush()
+        except SerialTimeoutException:
+            logging.error('Timeout while sending command %s', command)
+            return ''
+        if written != len(payload):
+            logging.warning('Only %s of %s bytes sent for command %s', written, len(payload), command)
+        reply = self._read_reply()
+        prompt = self.MATCH_PROMPT.search(reply)
+        if prompt:
+            reply = reply[:prompt.start()]
+        reply = reply.decode('ascii', 'replace').replace('\r', '\n')
+        logging.debug('Serial reply:\n%s', reply)
         return reply
 
     def add_node(self, kind, number, address):
@@ -748,14 +1079,16 @@ class DucoInterface(object):
         Returns:
             The node object added
         '''
-        nodeclass = DucoNode
-        for cls in DucoNode.get_subclasses():
-            if cls.KIND == kind:
-                nodeclass = cls
+        nodeclass = NODE_CLASSES.get(kind)
+        if nodeclass is None:
+            # Pick up node classes which were defined after this module got imported
+            NODE_CLASSES.update((cls.KIND, cls) for cls in DucoNode.get_subclasses() if cls.KIND)
+            nodeclass = NODE_CLASSES.get(kind, DucoNode)
         if nodeclass == DucoNode:
-            logging.warning('Unknown node kind: {kind}, assuming default'.format(kind=kind))
+            logging.warning('Unknown node kind: %s, assuming default', kind)
         node = nodeclass(number, address, self)
         self.nodes.append(node)
+        self._nodes_by_number[node.number] = node
         return node
 
     def find_nodes(self):
@@ -763,39 +1096,79 @@ class DucoInterface(object):
         Get nodes in the DucoInterface's network
 
         Searches the network of the DucoBox though the interface, and stores objects for all of the found nodes.
+        Nodes which are already known are kept as they are.
         '''
-        if self._serial:
-            logging.info('Searching network...')
-            reply = self.execute_command(self.LIST_NETWORK_COMMAND)
-            for line in reply.split('\n'):
-                match = re.compile(self.MATCH_NETWORK_COMMAND).search(line)
-                if match:
-                    self.add_node(match.group('kind'), match.group('node'), match.group('address'))
-                    self._live = True
+        logging.info('Searching network...')
+        reply = self.execute_command(self.LIST_NETWORK_COMMAND)
+        for match in self.MATCH_NETWORK_COMMAND.finditer(reply):
+            if self.get_node(match.group('node')) is None:
+                self.add_node(match.group('kind'), match.group('node'), match.group('address'))
+            self._live = True
+
+    def wait_online(self, timeout):
+        '''
+        Search the network until it is found, or until the timeout has passed
+
+        A serial port which is busy or still being set up is retried with the backoff of the serial port.
+        When the port opens but no network is found, the search is repeated every SERIAL_RETRY_INTERVAL.
+
+        Args:
+            timeout (float): Time in seconds to keep retrying
+        Returns:
+            bool: True if the network was found
+        '''
+        deadline = monotonic() + timeout
+        self.find_nodes()
+        while not self.is_online():
+            now = monotonic()
+            if now >= deadline:
+                break
+            retry_at = self._serial_retry_at
+            if retry_at is None:
+                retry_at = now + SERIAL_RETRY_INTERVAL
+            time.sleep(max(0, min(retry_at, deadline) - now))
+            self.find_nodes()
+        return self.is_online()
 
     def sample(self):
         '''
         Take samples from all nodes in the network
         '''
         if self.is_online():
-            logging.info('Taking sample {t}'.format(t=time.strftime("%c")))
+            if logging.getLogger().isEnabledFor(logging.INFO):
+                logging.info('Taking sample %s', time.strftime("%c"))
             for node in self.nodes:
                 node.sample()
+            if self._database:
+                self._database.flush()
 
     def get_node(self, number):
         '''
         Get a node with given node number
 
+        Nodes are looked up by number in an index. The list of nodes is scanned when the index has no
+        match, or a stale one, which happens for nodes appended to the list directly or renumbered later.
+
         Args:
             number (str): Number for the node to be found
         Returns:
             Node object with matching address
         '''
+        node = self._nodes_by_number.get(number)
+        if node is not None and node.number == number:
+            return node
         for node in self.nodes:
             if node.number == number:
+                self._nodes_by_number[number] = node
                 return node
         return None
 
+    def _index_nodes(self):
+        '''
+        Rebuild the index of the nodes by their number
+        '''
+        self._nodes_by_number = dict((node.number, node) for node in self.nodes)
+
 
 def ducobox_wrapper(args):
     '''
@@ -815,6 +1188,9 @@ def ducobox_wrapper(args):
     parser.add_argument('-i', '--interval', type=float, dest='interval', default=DEFAULT_INTERVAL,
                         action='store', required=False,
                         help='Level for logging (strings from logging python package)')
+    parser.add_argument('-t', '--startup-timeout', type=float, dest='startup_timeout', default=DEFAULT_STARTUP_TIMEOUT,
+                        action='store', required=False,
+                        help='Time in seconds to keep searching for the Duco network at startup')
     parser.add_argument('-p', '--port', type=str, dest='port',
                         help='Serial port to connect to DucoInterface',
                         required=True, action='store',)
@@ -834,16 +1210,26 @@ def ducobox_wrapper(args):
     if args.influxdb is not None:
         itf.bind_database(InfluxDb(args.influxdb))
 
-    itf.find_nodes()
+    itf.wait_online(args.startup_timeout)
 
     itf.load()
 
-    if itf.is_online():
-        itf.store()
+    if not itf.is_online():
+        logging.error('No Duco network found on %s, stopping', args.port)
+        return 1
+
+    itf.store()
 
+    next_sample = monotonic()
     while(True):
         itf.sample()
-        time.sleep(args.interval)
+        next_sample += args.interval
+        delay = next_sample - monotonic()
+        if delay < 0:
+            logging.warning('Sampling took longer than the interval of %s s, consider increasing it', args.interval)
+            next_sample -= delay
+            delay = 0
+        time.sleep(delay)
 
     return 0
 
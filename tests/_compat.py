@@ -0,0 +1,8 @@
+'''Imports which differ between python 2 and python 3, resolved once for all tests'''
+
+try:
+    from unittest.mock import MagicMock, call, mock_open, patch
+except ImportError:
+    from mock import MagicMock, call, mock_open, patch
+
+__all__ = ['MagicMock', 'call', 'mock_open', 'patch']
@@ -0,0 +1,33 @@
+'''Replies of the Duco interface, as recorded in the tests/cmd_*.txt files, read only once per test run'''
+
+_replies = {}
+_serial_replies = {}
+
+
+def read_reply(name):
+    '''
+    Get the reply on a command, as returned by DucoInterface.execute_command
+
+    Args:
+        name (str): Name of the recording: tests/cmd_<name>.txt
+    Returns:
+        str: Recorded reply
+    '''
+    if name not in _replies:
+        with open('tests/cmd_{name}.txt'.format(name=name), 'rb') as cmdfile:
+            _replies[name] = cmdfile.read().decode('utf-8')
+    return _replies[name]
+
+
+def read_serial_reply(name):
+    '''
+    Get the reply on a command, as received on the serial port
+
+    Args:
+        name (str): Name of the recording: tests/cmd_<name>.txt
+    Returns:
+        bytes: Recorded reply, with carriage returns as line endings
+    '''
+    if name not in _serial_replies:
+        _serial_replies[name] = read_reply(name).replace('\n', '\r').encode('utf-8')
+    return _serial_replies[name]
@@ -0,0 +1,27 @@
+'''Mocks of the Duco collaborators, with their specification taken from the real classes once for all tests'''
+
+import duco.ducobox as dut
+from _compat import MagicMock
+
+_INTERFACE_SPEC = tuple(dir(dut.DucoInterface))
+_CONFIG_PARSER_SPEC = tuple(dir(dut.ConfigParser))
+
+
+def interface_mock():
+    '''
+    Get a fresh mock of a DucoInterface
+
+    Returns:
+        MagicMock: Mock only accepting the attributes of DucoInterface
+    '''
+    return MagicMock(spec=_INTERFACE_SPEC)
+
+
+def config_parser_mock():
+    '''
+    Get a fresh mock of a ConfigParser
+
+    Returns:
+        MagicMock: Mock only accepting the attributes of ConfigParser
+    '''
+    return MagicMock(spec=_CONFIG_PARSER_SPEC)
@@ -1,31 +1,26 @@
 from unittest import TestCase
-try:
-    from unittest.mock import MagicMock, patch
-except ImportError:
-    from mock import MagicMock, patch
 
 import duco.ducobox as dut
+from _mocks import interface_mock
+from _fixtures import read_reply
 
 
 class TestDucoBox(TestCase):
 
-    @patch('duco.ducobox.DucoInterface', autospec=True)
-    def test_happy(self, itf_mock):
+    def test_happy(self):
         box = dut.DucoBox(1, 2)
-        itf_mock_object = MagicMock(spec=dut.DucoInterface)
+        itf_mock_object = interface_mock()
         box.bind_serial(itf_mock_object)
 
-        with open('tests/cmd_fanspeed.txt') as cmdfile:
-            itf_mock_object.execute_command.return_value = cmdfile.read()
+        itf_mock_object.execute_command.return_value = read_reply('fanspeed')
         box.sample()
         itf_mock_object.execute_command.assert_called_once_with('fanspeed')
 
         self.assertEqual(int(box.parameters[dut.FANSPEED_STR].get_value()), 1449)
 
-    @patch('duco.ducobox.DucoInterface', autospec=True)
-    def test_no_values(self, itf_mock):
+    def test_no_values(self):
         box = dut.DucoBox(1, 2)
-        itf_mock_object = MagicMock(spec=dut.DucoInterface)
+        itf_mock_object = interface_mock()
         box.bind_serial(itf_mock_object)
 
         itf_mock_object.execute_command.return_value = 'invalid command'
@@ -33,3 +28,21 @@ class TestDucoBox(TestCase):
         itf_mock_object.execute_command.assert_called_once_with('fanspeed')
 
         self.assertEqual(box.parameters[dut.FANSPEED_STR].get_value(), None)
+
+    def test_board_info(self):
+        itf_mock_object = interface_mock()
+        itf_mock_object.execute_command.return_value = '\n'.join(['BootSW : 1.2.3',
+                                                                  'Serial : 0123456789',
+                                                                  'Board  : DUCOBOX SILENT',
+                                                                  'Type   : 17',
+                                                                  'DevId  : 0x1234',
+                                                                  '> '])
+        box = dut.DucoBox(1, 2, interface=itf_mock_object)
+        itf_mock_object.execute_command.assert_called_once_with('boardinfo')
+
+        self.assertEqual(box.boot_software, '1.2.3')
+        self.assertEqual(box.serial, '0123456789')
+        self.assertEqual(box.board_name, 'DUCOBOX SILENT')
+        self.assertEqual(box.board_type, '17')
+        self.assertEqual(box.device_id, '0x1234')
+        itf_mock_object.set_extended.assert_called_once_with()
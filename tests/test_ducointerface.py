@@ -1,23 +1,186 @@
 from unittest import TestCase
-try:
-    from unittest.mock import MagicMock, patch, mock_open
-except ImportError:
-    from mock import MagicMock, patch, mock_open
+import itertools
+import os
+import shutil
+import tempfile
 
-from serial import Serial
+from serial import Serial, SerialException, SerialTimeoutException
 import duco.ducobox as dut
+from _compat import MagicMock, patch, mock_open
+from _mocks import config_parser_mock
+from _fixtures import read_serial_reply
+
+try:
+    from termios import error as termios_error
+except ImportError:
+    termios_error = OSError
 
 
 class TestDucoInterface(TestCase):
 
     MOCK_PORT_NAME = '/dev/my/mocked_serial_port'
     MOCK_CFG_FILE = '/tmp/my/mocked_config_file'
+    MOCK_CFG_STALE = '[Node1]\nnumber = 1\n'
+
+    @patch.dict(dut.NODE_CLASSES)
+    def test_add_node_late_subclass(self):
+        class DucoTestNode(dut.DucoNode):
+            KIND = 'TESTNODE'
+
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+        node = itf.add_node('TESTNODE', 5, 105)
+        self.assertIsInstance(node, DucoTestNode)
+        self.assertIs(itf.get_node('5'), node)
+
+    def test_get_node_appended(self):
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+        node = dut.DucoNode('11', '22', itf)
+        itf.nodes.append(node)
+        self.assertIs(itf.get_node('11'), node)
+
+    def test_get_node_renumbered(self):
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+        node = itf.add_node('CLIMA', 11, 22)
+        node._load({'Node11': {'name': 'grille', 'number': '33', 'address': '22', 'blacklist': 'False'}})
+        self.assertIsNone(itf.get_node('11'))
+        self.assertIs(itf.get_node('33'), node)
+
+    def test_execute_commands_offline(self):
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+        self.assertEqual(list(itf.execute_commands(['first', 'second'])), [])
+
+    def test_store_no_file(self):
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+        itf.store()
+
+    def test_store_invalid_file(self):
+        open_mock = mock_open(read_data=self.MOCK_CFG_STALE)
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME, self.MOCK_CFG_FILE)
+        with patch('duco.ducobox.open', open_mock, create=True):
+            itf.store()
+        open_mock.assert_called_with(self.MOCK_CFG_FILE, 'w')
+
+    def test_store_no_nodes(self):
+        open_mock = mock_open(read_data=self.MOCK_CFG_STALE)
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME, self.MOCK_CFG_FILE)
+        with patch('duco.ducobox.open', open_mock, create=True):
+            itf.store()
+        open_mock.assert_called_with(self.MOCK_CFG_FILE, 'w')
+
+    def test_store_unchanged(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            cfgfile = os.path.join(tmpdir, 'network.ini')
+            itf = dut.DucoInterface(self.MOCK_PORT_NAME, cfgfile)
+            itf.add_node('CLIMA', 11, 22)
+            itf.store()
+
+            itf = dut.DucoInterface(self.MOCK_PORT_NAME, cfgfile)
+            itf.add_node('CLIMA', 11, 22)
+            open_mock = MagicMock(wraps=open)
+            with patch('duco.ducobox.open', open_mock, create=True):
+                itf.store()
+            open_mock.assert_called_once_with(cfgfile)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_store_removed(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            cfgfile = os.path.join(tmpdir, 'network.ini')
+            itf = dut.DucoInterface(self.MOCK_PORT_NAME, cfgfile)
+            itf.add_node('CLIMA', 11, 22)
+            itf.store()
+
+            os.remove(cfgfile)
+            itf.store()
+            with open(cfgfile) as cfg:
+                self.assertIn('[Node11]', cfg.read())
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_load_unchanged(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            cfgfile = os.path.join(tmpdir, 'network.ini')
+            itf = dut.DucoInterface(self.MOCK_PORT_NAME, cfgfile)
+            node = itf.add_node('CLIMA', 11, 22)
+            node.name = 'grille'
+            itf.store()
+
+            node.name = 'renamed'
+            with patch('duco.ducobox.ConfigParser') as cfgparser_mock:
+                itf.load()
+            cfgparser_mock.assert_not_called()
+            self.assertEqual(node.name, 'grille')
+
+            with open(cfgfile, 'a') as cfg:
+                cfg.write('[Extra]\nkey = value\n')
+            with patch('duco.ducobox.ConfigParser', wraps=dut.ConfigParser) as cfgparser_mock:
+                itf.load()
+            cfgparser_mock.assert_called_once_with()
+            self.assertEqual(node.name, 'grille')
+        finally:
+            shutil.rmtree(tmpdir)
+
+    @patch('duco.ducobox.ConfigParser')
+    def test_store_single_node(self, cfgparser_mock):
+        cfgparser_mock_object = config_parser_mock()
+        cfgparser_mock.return_value = cfgparser_mock_object
+        print(cfgparser_mock_object)
+        open_mock = mock_open(read_data=self.MOCK_CFG_STALE)
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME, self.MOCK_CFG_FILE)
+        node = dut.DucoNode('11', '22', itf)
+        itf.nodes.append(node)
+        with patch('duco.ducobox.open', open_mock, create=True):
+            itf.store()
+        open_mock.assert_called_with(self.MOCK_CFG_FILE, 'w')
+        # cfgparser_mock_object.add_section.assert_called_once()
+        # cfgparser_mock_object.write.assert_called_once()
+
+
+@patch('duco.ducobox.Serial', autospec=True)
+class TestDucoInterfaceSerial(TestCase):
+
+    MOCK_PORT_NAME = '/dev/my/mocked_serial_port'
+    PROMPT = b'\r> '
+
+    NETWORK_SIMPLE_NODES = (
+        ('1', dut.DucoBox, '1'),
+        ('2', dut.DucoUserControlBattery, '102'),
+        ('34', dut.DucoUserControlHumiditySensor, '132'),
+        ('44', dut.DucoUserControlCO2Sensor, '142'),
+        ('99', dut.DucoNode, '999'),
+    )
+
+    NETWORK_COMPLEX_NODES = (
+        ('1', dut.DucoBox, '1'),
+        ('2', dut.DucoValveHumiditySensor, '2'),
+        ('3', dut.DucoValve, '3'),
+        ('4', dut.DucoValveHumiditySensor, '4'),
+        ('5', dut.DucoValve, '5'),
+        ('6', dut.DucoValveCO2Sensor, '6'),
+        ('7', dut.DucoValve, '7'),
+        ('8', dut.DucoValveHumiditySensor, '8'),
+        ('9', dut.DucoUserControlHumiditySensor, '102'),
+        ('10', dut.DucoUserControlCO2Sensor, '103'),
+        ('11', dut.DucoSwitch, '104'),
+        ('12', dut.DucoUserControlHumiditySensor, '105'),
+        ('13', dut.DucoUserControlCO2Sensor, '106'),
+        ('14', dut.DucoUserControlCO2Sensor, '107'),
+        ('15', dut.DucoSwitch, '108'),
+        ('16', dut.DucoUserControlCO2Sensor, '109'),
+        ('17', dut.DucoGrille, '110'),
+        ('18', dut.DucoUserControl, '111'),
+        ('19', dut.DucoGrille, '112'),
+        ('20', dut.DucoGrille, '113'),
+        ('133', dut.DucoSwitch, '132'),
+    )
 
     @staticmethod
     def duco_encoded(c):
         return c.encode('utf-8')
 
-    @patch('duco.ducobox.Serial', autospec=True)
     def test_network_simple(self, serial_mock):
         serial_mock_object = MagicMock(spec=Serial)
         serial_mock.return_value = serial_mock_object
@@ -25,43 +188,21 @@ class TestDucoInterface(TestCase):
 
         self.assertFalse(itf.is_online())
 
-        with open('tests/cmd_network_simple.txt') as cmdfile:
-            serial_mock_object.readline.return_value = cmdfile.read().replace('\n', '\r')
+        serial_mock_object.read_until.return_value = read_serial_reply('network_simple') + self.PROMPT
         itf.find_nodes()
-        # TODO: enable assert when write of command is a single API call again
-        # serial_mock_object.write.assert_called_once_with(self.duco_encoded('network'))
+        serial_mock_object.write.assert_any_call(self.duco_encoded('network\r'))
 
         self.assertTrue(itf.is_online())
 
-        node = itf.get_node('1')
-        self.assertIsInstance(node, dut.DucoBox)
-        self.assertEqual(node.number, '1')
-        self.assertEqual(node.address, '1')
-
-        node = itf.get_node('2')
-        self.assertIsInstance(node, dut.DucoUserControlBattery)
-        self.assertEqual(node.number, '2')
-        self.assertEqual(node.address, '102')
-
-        node = itf.get_node('34')
-        self.assertIsInstance(node, dut.DucoUserControlHumiditySensor)
-        self.assertEqual(node.number, '34')
-        self.assertEqual(node.address, '132')
-
-        node = itf.get_node('44')
-        self.assertIsInstance(node, dut.DucoUserControlCO2Sensor)
-        self.assertEqual(node.number, '44')
-        self.assertEqual(node.address, '142')
-
-        node = itf.get_node('99')
-        self.assertIsInstance(node, dut.DucoNode)
-        self.assertEqual(node.number, '99')
-        self.assertEqual(node.address, '999')
+        for number, nodeclass, address in self.NETWORK_SIMPLE_NODES:
+            node = itf.get_node(number)
+            self.assertIsInstance(node, nodeclass)
+            self.assertEqual(node.number, number)
+            self.assertEqual(node.address, address)
 
         node = itf.get_node('1234')
         self.assertIsNone(node)
 
-    @patch('duco.ducobox.Serial', autospec=True)
     def test_network_complex(self, serial_mock):
         serial_mock_object = MagicMock(spec=Serial)
         serial_mock.return_value = serial_mock_object
@@ -69,148 +210,233 @@ class TestDucoInterface(TestCase):
 
         self.assertFalse(itf.is_online())
 
-        with open('tests/cmd_network_complex.txt') as cmdfile:
-            serial_mock_object.readline.return_value = cmdfile.read().replace('\n', '\r')
+        serial_mock_object.read_until.return_value = read_serial_reply('network_complex') + self.PROMPT
         itf.find_nodes()
-        # TODO: enable assert when write of command is a single API call again
-        # serial_mock_object.write.assert_called_once_with(self.duco_encoded('network'))
+        serial_mock_object.write.assert_any_call(self.duco_encoded('network\r'))
 
         self.assertTrue(itf.is_online())
 
-        node = itf.get_node('1')
-        self.assertIsInstance(node, dut.DucoBox)
-        self.assertEqual(node.number, '1')
-        self.assertEqual(node.address, '1')
+        for number, nodeclass, address in self.NETWORK_COMPLEX_NODES:
+            node = itf.get_node(number)
+            self.assertIsInstance(node, nodeclass)
+            self.assertEqual(node.number, number)
+            self.assertEqual(node.address, address)
+
+    def test_network_chunked(self, serial_mock):
+        serial_mock_object = MagicMock(spec=Serial)
+        serial_mock.return_value = serial_mock_object
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+
+        # a single read only returns what arrives within the serial timeout
+        reply = read_serial_reply('network_complex')
+        chunks = [reply[start:start + 1000] for start in range(0, len(reply), 1000)]
+        chunks[-1] += self.PROMPT
+        # the DucoBox node asks for its board info after the network list, which gets an empty reply
+        serial_mock_object.read_until.side_effect = itertools.chain([self.PROMPT], chunks, itertools.repeat(self.PROMPT))
+        itf.find_nodes()
+
+        for number, nodeclass, address in self.NETWORK_COMPLEX_NODES:
+            node = itf.get_node(number)
+            self.assertIsInstance(node, nodeclass)
+            self.assertEqual(node.address, address)
+
+    def test_prompt_variants(self, serial_mock):
+        serial_mock_object = MagicMock(spec=Serial)
+        serial_mock.return_value = serial_mock_object
+
+        for prompt in [b'\r> ', b'\r>', b'\n> ', b'\r\n>']:
+            itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+            serial_mock_object.read_until.side_effect = [b'>', b'reply' + prompt]
+            self.assertEqual(itf.execute_command('first'), 'reply')
+
+    def test_prompt_inside_reply(self, serial_mock):
+        serial_mock_object = MagicMock(spec=Serial)
+        serial_mock.return_value = serial_mock_object
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+
+        # reading stops at every '>', also the one of the arrow in a nodeparaget reply
+        serial_mock_object.read_until.side_effect = [self.PROMPT, b'  -->', b' 512\rDone' + self.PROMPT]
+        self.assertEqual(itf.execute_command('nodeparaget 1 74'), '  --> 512\nDone')
+
+    @patch('duco.ducobox.time.sleep')
+    @patch('duco.ducobox.monotonic')
+    def test_wait_online(self, monotonic_mock, sleep_mock, serial_mock):
+        serial_mock_object = MagicMock(spec=Serial)
+        serial_mock.side_effect = [SerialException('busy'), serial_mock_object]
+        serial_mock_object.read_until.return_value = read_serial_reply('network_simple') + self.PROMPT
+        clock = [100]
+        monotonic_mock.side_effect = lambda: clock[0]
+        sleep_mock.side_effect = lambda delay: clock.__setitem__(0, clock[0] + delay)
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+
+        self.assertTrue(itf.wait_online(60))
+        sleep_mock.assert_called_once_with(dut.SERIAL_RETRY_INTERVAL)
+        self.assertEqual(serial_mock.call_count, 2)
+
+    @patch('duco.ducobox.time.sleep')
+    @patch('duco.ducobox.monotonic')
+    def test_wait_online_timeout(self, monotonic_mock, sleep_mock, serial_mock):
+        serial_mock.side_effect = SerialException('busy')
+        clock = [100]
+        monotonic_mock.side_effect = lambda: clock[0]
+        sleep_mock.side_effect = lambda delay: clock.__setitem__(0, clock[0] + delay)
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+
+        self.assertFalse(itf.wait_online(10))
+        self.assertEqual(clock[0], 110)
+        # retried after 1, 2 and 4 s, the next retry at 8 s would be past the timeout
+        self.assertEqual(serial_mock.call_count, 4)
 
+    @patch('duco.ducobox.monotonic')
+    def test_reply_timeout(self, monotonic_mock, serial_mock):
+        serial_mock_object = MagicMock(spec=Serial)
+        serial_mock.return_value = serial_mock_object
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+
+        monotonic_mock.side_effect = itertools.count()
+        serial_mock_object.read_until.side_effect = [self.PROMPT] + [b'no prompt'] * (dut.SERIAL_REPLY_TIMEOUT + 1)
+        with patch('duco.ducobox.logging.warning') as warning_mock:
+            self.assertEqual(itf.execute_command('first'), 'no prompt' * dut.SERIAL_REPLY_TIMEOUT)
+        self.assertIn('No prompt received', warning_mock.call_args[0][0])
+
+    def test_network_rescan(self, serial_mock):
+        serial_mock_object = MagicMock(spec=Serial)
+        serial_mock.return_value = serial_mock_object
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+
+        serial_mock_object.read_until.return_value = read_serial_reply('network_simple') + self.PROMPT
+        itf.find_nodes()
+        nodes = list(itf.nodes)
         node = itf.get_node('2')
-        self.assertIsInstance(node, dut.DucoValveHumiditySensor)
-        self.assertEqual(node.number, '2')
-        self.assertEqual(node.address, '2')
-
-        node = itf.get_node('3')
-        self.assertIsInstance(node, dut.DucoValve)
-        self.assertEqual(node.number, '3')
-        self.assertEqual(node.address, '3')
-
-        node = itf.get_node('4')
-        self.assertIsInstance(node, dut.DucoValveHumiditySensor)
-        self.assertEqual(node.number, '4')
-        self.assertEqual(node.address, '4')
-
-        node = itf.get_node('5')
-        self.assertIsInstance(node, dut.DucoValve)
-        self.assertEqual(node.number, '5')
-        self.assertEqual(node.address, '5')
-
-        node = itf.get_node('6')
-        self.assertIsInstance(node, dut.DucoValveCO2Sensor)
-        self.assertEqual(node.number, '6')
-        self.assertEqual(node.address, '6')
-
-        node = itf.get_node('7')
-        self.assertIsInstance(node, dut.DucoValve)
-        self.assertEqual(node.number, '7')
-        self.assertEqual(node.address, '7')
-
-        node = itf.get_node('8')
-        self.assertIsInstance(node, dut.DucoValveHumiditySensor)
-        self.assertEqual(node.number, '8')
-        self.assertEqual(node.address, '8')
-
-        node = itf.get_node('9')
-        self.assertIsInstance(node, dut.DucoUserControlHumiditySensor)
-        self.assertEqual(node.number, '9')
-        self.assertEqual(node.address, '102')
-
-        node = itf.get_node('10')
-        self.assertIsInstance(node, dut.DucoUserControlCO2Sensor)
-        self.assertEqual(node.number, '10')
-        self.assertEqual(node.address, '103')
-
-        node = itf.get_node('11')
-        self.assertIsInstance(node, dut.DucoSwitch)
-        self.assertEqual(node.number, '11')
-        self.assertEqual(node.address, '104')
-
-        node = itf.get_node('12')
-        self.assertIsInstance(node, dut.DucoUserControlHumiditySensor)
-        self.assertEqual(node.number, '12')
-        self.assertEqual(node.address, '105')
-
-        node = itf.get_node('13')
-        self.assertIsInstance(node, dut.DucoUserControlCO2Sensor)
-        self.assertEqual(node.number, '13')
-        self.assertEqual(node.address, '106')
-
-        node = itf.get_node('14')
-        self.assertIsInstance(node, dut.DucoUserControlCO2Sensor)
-        self.assertEqual(node.number, '14')
-        self.assertEqual(node.address, '107')
-
-        node = itf.get_node('15')
-        self.assertIsInstance(node, dut.DucoSwitch)
-        self.assertEqual(node.number, '15')
-        self.assertEqual(node.address, '108')
-
-        node = itf.get_node('16')
-        self.assertIsInstance(node, dut.DucoUserControlCO2Sensor)
-        self.assertEqual(node.number, '16')
-        self.assertEqual(node.address, '109')
-
-        node = itf.get_node('17')
-        self.assertIsInstance(node, dut.DucoGrille)
-        self.assertEqual(node.number, '17')
-        self.assertEqual(node.address, '110')
-
-        node = itf.get_node('18')
-        self.assertIsInstance(node, dut.DucoUserControl)
-        self.assertEqual(node.number, '18')
-        self.assertEqual(node.address, '111')
-
-        node = itf.get_node('19')
-        self.assertIsInstance(node, dut.DucoGrille)
-        self.assertEqual(node.number, '19')
-        self.assertEqual(node.address, '112')
-
-        node = itf.get_node('20')
-        self.assertIsInstance(node, dut.DucoGrille)
-        self.assertEqual(node.number, '20')
-        self.assertEqual(node.address, '113')
-
-        node = itf.get_node('133')
-        self.assertIsInstance(node, dut.DucoSwitch)
-        self.assertEqual(node.number, '133')
-        self.assertEqual(node.address, '132')
+        itf.find_nodes()
 
-    def test_store_no_file(self):
+        self.assertEqual(itf.nodes, nodes)
+        self.assertIs(itf.get_node('2'), node)
+
+    def test_execute_commands(self, serial_mock):
+        serial_mock_object = MagicMock(spec=Serial)
+        serial_mock.return_value = serial_mock_object
         itf = dut.DucoInterface(self.MOCK_PORT_NAME)
-        itf.store()
 
-    def test_store_invalid_file(self):
-        open_mock = mock_open()
-        itf = dut.DucoInterface(self.MOCK_PORT_NAME, self.MOCK_CFG_FILE)
-        with patch('duco.ducobox.open', open_mock, create=True):
-            itf.store()
-        open_mock.assert_called_once_with(self.MOCK_CFG_FILE, 'w')
+        serial_mock_object.read_until.side_effect = [self.PROMPT, b'first reply' + self.PROMPT, b'second reply' + self.PROMPT]
+        replies = itf.execute_commands(['first', 'second'])
+        self.assertEqual(replies, ['first reply', 'second reply'])
+        self.assertFalse(itf._serial_lock.locked())
+        self.assertEqual(serial_mock_object.read_until.call_count, 3)
 
-    def test_store_no_nodes(self):
-        open_mock = mock_open()
-        itf = dut.DucoInterface(self.MOCK_PORT_NAME, self.MOCK_CFG_FILE)
-        with patch('duco.ducobox.open', open_mock, create=True):
-            itf.store()
-        open_mock.assert_called_once_with(self.MOCK_CFG_FILE, 'w')
+    def test_lazy_open(self, serial_mock):
+        serial_mock_object = MagicMock(spec=Serial)
+        serial_mock.return_value = serial_mock_object
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+        serial_mock.assert_not_called()
 
-    @patch('duco.ducobox.ConfigParser', autospec=True)
-    def test_store_single_node(self, cfgparser_mock):
-        cfgparser_mock_object = MagicMock(spec=dut.ConfigParser)
-        cfgparser_mock.return_value = cfgparser_mock_object
-        print(cfgparser_mock_object)
-        open_mock = mock_open()
-        itf = dut.DucoInterface(self.MOCK_PORT_NAME, self.MOCK_CFG_FILE)
-        node = dut.DucoNode('11', '22', itf)
-        itf.nodes.append(node)
-        with patch('duco.ducobox.open', open_mock, create=True):
-            itf.store()
-        open_mock.assert_called_once_with(self.MOCK_CFG_FILE, 'w')
-        # cfgparser_mock_object.add_section.assert_called_once()
-        # cfgparser_mock_object.write.assert_called_once()
+        serial_mock_object.read_until.return_value = b'reply' + self.PROMPT
+        itf.execute_command('first')
+        itf.execute_command('second')
+        self.assertEqual(serial_mock.call_count, 1)
+        serial_mock_object.set_low_latency_mode.assert_called_once_with(True)
+
+    def test_low_latency_unsupported(self, serial_mock):
+        serial_mock_object = MagicMock(spec=Serial)
+        serial_mock.return_value = serial_mock_object
+
+        serial_mock_object.read_until.return_value = b'reply' + self.PROMPT
+        for error in [ValueError('Failed to update ASYNC_LOW_LATENCY flag'),
+                      NotImplementedError('Low latency not supported on this platform')]:
+            serial_mock_object.set_low_latency_mode.side_effect = error
+            itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+            self.assertEqual(itf.execute_command('first'), 'reply')
+
+    def test_sample_no_parameters(self, serial_mock):
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+        node = itf.add_node('SWITCH', 11, 22)
+        node.sample()
+        serial_mock.assert_not_called()
+
+    def test_bytes_command(self, serial_mock):
+        serial_mock_object = MagicMock(spec=Serial)
+        serial_mock.return_value = serial_mock_object
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+
+        serial_mock_object.read_until.return_value = b'reply' + self.PROMPT
+        self.assertEqual(itf.execute_command(b'first'), 'reply')
+        serial_mock_object.write.assert_called_with(b'first\r')
+
+    @patch('duco.ducobox.monotonic')
+    def test_open_retry(self, monotonic_mock, serial_mock):
+        serial_mock_object = MagicMock(spec=Serial)
+        serial_mock.side_effect = [SerialException('busy'), SerialException('busy'), serial_mock_object]
+        serial_mock_object.read_until.return_value = b'reply' + self.PROMPT
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+
+        monotonic_mock.return_value = 100
+        self.assertEqual(itf.execute_command('first'), '')
+        self.assertEqual(itf.execute_command('first'), '')
+        self.assertEqual(serial_mock.call_count, 1)
+
+        monotonic_mock.return_value = 100 + dut.SERIAL_RETRY_INTERVAL
+        self.assertEqual(itf.execute_command('first'), '')
+        self.assertEqual(serial_mock.call_count, 2)
+
+        monotonic_mock.return_value = 100 + 2 * dut.SERIAL_RETRY_INTERVAL
+        self.assertEqual(itf.execute_command('first'), '')
+        self.assertEqual(serial_mock.call_count, 2)
+
+        monotonic_mock.return_value = 100 + 3 * dut.SERIAL_RETRY_INTERVAL
+        self.assertEqual(itf.execute_command('first'), 'reply')
+        self.assertEqual(serial_mock.call_count, 3)
+
+    def test_serial_lost(self, serial_mock):
+        serial_mock_object = MagicMock(spec=Serial)
+        serial_mock.return_value = serial_mock_object
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+
+        serial_mock_object.read_until.side_effect = [self.PROMPT, SerialException('device disconnected')]
+        self.assertEqual(list(itf.execute_commands(['first', 'second'])), [])
+        serial_mock_object.close.assert_called_once_with()
+
+        serial_mock_object.read_until.side_effect = None
+        serial_mock_object.read_until.return_value = b'reply' + self.PROMPT
+        self.assertEqual(itf.execute_command('first'), 'reply')
+        self.assertEqual(serial_mock.call_count, 2)
+
+    def test_write_timeout(self, serial_mock):
+        serial_mock_object = MagicMock(spec=Serial)
+        serial_mock.return_value = serial_mock_object
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+
+        serial_mock_object.write.side_effect = [1, SerialTimeoutException('Write timeout')]
+        serial_mock_object.read_until.return_value = b'reply' + self.PROMPT
+        self.assertEqual(itf.execute_command('first'), '')
+        self.assertEqual(serial_mock_object.read_until.call_count, 1)
+
+    def test_flush_failure(self, serial_mock):
+        serial_mock_object = MagicMock(spec=Serial)
+        serial_mock.return_value = serial_mock_object
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+
+        serial_mock_object.read_until.return_value = b'reply' + self.PROMPT
+        serial_mock_object.flush.side_effect = termios_error(5, 'Input/output error')
+        self.assertEqual(itf.execute_command('first'), '')
+        self.assertEqual(itf.execute_commands(['first', 'second']), [])
+        self.assertEqual(serial_mock_object.close.call_count, 2)
+
+        serial_mock_object.flush.side_effect = None
+        self.assertEqual(itf.execute_command('first'), 'reply')
+        self.assertEqual(serial_mock.call_count, 3)
+
+    def test_reset_failure(self, serial_mock):
+        serial_mock_object = MagicMock(spec=Serial)
+        serial_mock.return_value = serial_mock_object
+        itf = dut.DucoInterface(self.MOCK_PORT_NAME)
+
+        serial_mock_object.read_until.return_value = b'reply' + self.PROMPT
+        serial_mock_object.reset_input_buffer.side_effect = termios_error(5, 'Input/output error')
+        serial_mock_object.close.side_effect = OSError(5, 'Input/output error')
+        self.assertEqual(itf.execute_command('first'), '')
+        self.assertEqual(itf.execute_commands(['first', 'second']), [])
+        self.assertEqual(serial_mock_object.close.call_count, 2)
+
+        serial_mock_object.reset_input_buffer.side_effect = None
+        self.assertEqual(itf.execute_command('first'), 'reply')
+        self.assertEqual(serial_mock.call_count, 3)
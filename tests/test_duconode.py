@@ -1,95 +1,103 @@
 from unittest import TestCase
-try:
-    from unittest.mock import MagicMock, patch
-except ImportError:
-    from mock import MagicMock, patch
-
-try:
-    from configparser import NoSectionError, NoOptionError
-except ImportError:
-    from ConfigParser import NoSectionError, NoOptionError
 
 import duco.ducobox as dut
+from _mocks import config_parser_mock
 
 
 class TestDucoNode(TestCase):
 
-    def test_creation_int(self):
-        node = dut.DucoNode(333, 444)
-        self.assertEqual(int(node.number), 333)
-        self.assertEqual(int(node.address), 444)
-        self.assertIsNotNone(node.name)
-
-    def test_creation_str(self):
-        node = dut.DucoNode('333', '444')
-        self.assertEqual(int(node.number), 333)
-        self.assertEqual(int(node.address), 444)
+    CREATION_ARGUMENTS = (
+        (333, 444),
+        ('333', '444'),
+        (333.0, 444.0),
+    )
 
-    def test_creation_float(self):
-        node = dut.DucoNode(333.0, 444.0)
-        self.assertEqual(int(float(node.number)), 333)
-        self.assertEqual(int(float(node.address)), 444)
+    def test_creation(self):
+        for number, address in self.CREATION_ARGUMENTS:
+            node = dut.DucoNode(number, address)
+            self.assertEqual(int(float(node.number)), 333)
+            self.assertEqual(int(float(node.address)), 444)
+            self.assertIsNotNone(node.name)
 
     def test_equality(self):
-        node1 = dut.DucoNode(333, 444)
-        node2 = dut.DucoNode(222, 444)
-        self.assertEqual(node1, node2)
+        node = dut.DucoNode(333, 444)
+        for other, equal in ((dut.DucoNode(222, 444), True), (dut.DucoNode(222, 445), False)):
+            self.assertEqual(node == other, equal)
+            self.assertEqual(node != other, not equal)
 
-    def test_no_equality(self):
-        node1 = dut.DucoNode(333, 444)
-        node2 = dut.DucoNode(222, 445)
-        self.assertNotEqual(node1, node2)
+    def test_no_equality_other_type(self):
+        node = dut.DucoNode(333, 444)
+        self.assertNotEqual(node, '444')
+        self.assertFalse(node == None)  # noqa: E711
 
-    @patch('duco.ducobox.ConfigParser', autospec=True)
-    def test_store(self, cfgparser_mock):
+    def test_hash(self):
+        node1 = dut.DucoNode(333, 444)
+        node2 = dut.DucoNode(222, 444)
+        node3 = dut.DucoNode(222, 445)
+        self.assertEqual(hash(node1), hash(node2))
+        self.assertEqual(len(set([node1, node2, node3])), 2)
+
+    def test_slots(self):
+        node = dut.DucoUserControlHumiditySensor(1, 2)
+        for obj in [dut.DucoNode(1, 2), dut.DucoBox(1, 2), node] + list(node.parameters.values()):
+            self.assertFalse(hasattr(obj, '__dict__'))
+            with self.assertRaises(AttributeError):
+                obj.unknown_attribute = None
+
+    def test_store(self):
         node = dut.DucoNode(111, 222)
-        cfgparser_mock_object = MagicMock(spec=dut.ConfigParser)
+        cfgparser_mock_object = config_parser_mock()
         node._store(cfgparser_mock_object)
         section = 'Node111'
         cfgparser_mock_object.add_section.assert_called_once_with(section)
         cfgparser_mock_object.set.assert_any_call(section, 'number', '111')
         cfgparser_mock_object.set.assert_any_call(section, 'address', '222')
-        cfgparser_mock_object.set.assert_any_call(section, 'blacklist', False)
-
-    def load_test_side_effect(*args, **kwargs):
-        if args[2] == 'name':
-            return 'mocked device for utest'
-        elif args[2] == 'number':
-            return '888'
-        elif args[2] == 'address':
-            return '666'
-        elif args[2] == 'blacklist':
-            return True
-        raise Exception('ConfigParser with unexpected argument')
-
-    @patch('duco.ducobox.ConfigParser', autospec=True)
-    def test_load(self, cfgparser_mock):
+        cfgparser_mock_object.set.assert_any_call(section, 'blacklist', 'False')
+
+    def test_store_load_roundtrip(self):
+        node = dut.DucoNode(111, 222)
+        node.name = 'mocked device for utest'
+        node.blacklist = True
+        cfgparser = dut.ConfigParser()
+        node._store(cfgparser)
+        cfgfile = dut.StringIO()
+        cfgparser.write(cfgfile)
+        cfgfile.seek(0)
+
+        cfgparser = dut.ConfigParser()
+        getattr(cfgparser, 'read_file', getattr(cfgparser, 'readfp', None))(cfgfile)
+        loaded = dut.DucoNode(111, 333)
+        loaded._load(dut.DucoInterface._snapshot(cfgparser))
+        self.assertEqual(loaded.name, 'mocked device for utest')
+        self.assertEqual(int(loaded.address), 222)
+        self.assertEqual(loaded.blacklist, True)
+
+    def test_load(self):
         node = dut.DucoNode(111, 222)
-        cfgparser_mock_object = MagicMock(spec=dut.ConfigParser)
-        cfgparser_mock_object.get.side_effect = self.load_test_side_effect
-        cfgparser_mock_object.getboolean.side_effect = self.load_test_side_effect
-        node._load(cfgparser_mock_object)
+        configuration = {
+            'Node111': {
+                'name': 'mocked device for utest',
+                'number': '888',
+                'address': '666',
+                'blacklist': 'True',
+            },
+        }
+        node._load(configuration)
         self.assertEqual(node.name, 'mocked device for utest')
         self.assertEqual(int(node.number), 888)
         self.assertEqual(int(node.address), 666)
         self.assertEqual(node.blacklist, True)
 
-    @patch('duco.ducobox.ConfigParser', autospec=True)
-    def test_load_fail_no_section(self, cfgparser_mock):
+    def test_load_fail_no_section(self):
         node = dut.DucoNode(111, 222)
-        cfgparser_mock_object = MagicMock(spec=dut.ConfigParser)
-        cfgparser_mock_object.get.side_effect = NoSectionError('some message for missing config parser section')
-        node._load(cfgparser_mock_object)
+        node._load({'Node333': {'name': 'other device'}})
         self.assertEqual(int(node.number), 111)
         self.assertEqual(int(node.address), 222)
         self.assertEqual(node.blacklist, False)
 
-    @patch('duco.ducobox.ConfigParser', autospec=True)
-    def test_load_fail_no_option(self, cfgparser_mock):
+    def test_load_fail_no_option(self):
         node = dut.DucoNode(111, 222)
-        cfgparser_mock_object = MagicMock(spec=dut.ConfigParser)
-        cfgparser_mock_object.get.side_effect = NoOptionError('blacklist', 'some message for missing config parser option')
-        node._load(cfgparser_mock_object)
+        node._load({'Node111': {'name': 'mocked device for utest', 'number': '111', 'address': '222'}})
         self.assertEqual(int(node.number), 111)
         self.assertEqual(int(node.address), 222)
         self.assertEqual(node.blacklist, False)
@@ -105,3 +113,8 @@ class TestDucoNode(TestCase):
         node = dut.DucoNode(111, 222)
         self.assertTrue('111' in str(node))
         self.assertTrue('222' in str(node))
+
+    def test_stringify_parameter(self):
+        parameter = dut.DucoNodeTemperatureParaGet()
+        parameter.set_value(215)
+        self.assertEqual(str(parameter), '21.5 degC')
@@ -1,10 +1,8 @@
 from unittest import TestCase
-try:
-    from unittest.mock import MagicMock, patch, call
-except ImportError:
-    from mock import MagicMock, patch, call
 
 import duco.ducobox as dut
+from _mocks import interface_mock
+from _fixtures import read_reply
 
 
 class TestDucoUserControlCO2SensorExtended(TestCase):
@@ -17,45 +15,44 @@ class TestDucoUserControlCO2SensorExtended(TestCase):
     def nodeparaget_temperature(self, device):
         return self.node_paraget_cmd.format(device=device, para=dut.TEMPERATURE_PARAGET_ID)
 
+    def setUp(self):
+        self.paraget_replies = {
+            self.nodeparaget_co2(1): 'paraget_co2',
+            self.nodeparaget_temperature(1): 'paraget_temperature',
+            self.nodeparaget_co2(255): 'paraget_failed',
+            self.nodeparaget_temperature(255): 'paraget_failed',
+        }
+
     def callback_execute_cmd_nodeparaget(self, cmd):
-        if cmd == self.nodeparaget_co2(1):
-            with open('tests/cmd_paraget_co2.txt') as cmdfile:
-                return cmdfile.read()
-        elif cmd == self.nodeparaget_temperature(1):
-            with open('tests/cmd_paraget_temperature.txt') as cmdfile:
-                return cmdfile.read()
-        elif cmd == self.nodeparaget_co2(255) or cmd == self.nodeparaget_temperature(255):
-            with open('tests/cmd_paraget_failed.txt') as cmdfile:
-                return cmdfile.read()
-        self.fail('unknown nodeparaget command')
-        return None
-
-    @patch('duco.ducobox.DucoInterface', autospec=True)
-    def test_happy(self, itf_mock):
+        if cmd not in self.paraget_replies:
+            self.fail('unknown nodeparaget command')
+        return read_reply(self.paraget_replies[cmd])
+
+    def callback_execute_cmds_nodeparaget(self, cmds):
+        return [self.callback_execute_cmd_nodeparaget(cmd) for cmd in cmds]
+
+    def test_happy(self):
         sensor = dut.DucoUserControlCO2Sensor(1, 2)
-        itf_mock_object = MagicMock(spec=dut.DucoInterface)
+        itf_mock_object = interface_mock()
         sensor.bind_serial(itf_mock_object)
 
-        itf_mock_object.execute_command.side_effect = self.callback_execute_cmd_nodeparaget
+        itf_mock_object.execute_commands.side_effect = self.callback_execute_cmds_nodeparaget
         sensor.sample()
-        co2_call = call(self.nodeparaget_co2(1))
-        temperature_call = call(self.nodeparaget_temperature(1))
-        itf_mock_object.execute_command.assert_has_calls([co2_call, temperature_call], any_order=True)
+        commands = itf_mock_object.execute_commands.call_args[0][0]
+        self.assertEqual(sorted(commands), sorted([self.nodeparaget_co2(1), self.nodeparaget_temperature(1)]))
 
         self.assertEqual(sensor.get_value(dut.CO2_STR), 512)
         self.assertEqual(sensor.get_value(dut.TEMPERATURE_STR), 27.5)
 
-    @patch('duco.ducobox.DucoInterface', autospec=True)
-    def test_no_values(self, itf_mock):
+    def test_no_values(self):
         sensor = dut.DucoUserControlCO2Sensor(255, 2)
-        itf_mock_object = MagicMock(spec=dut.DucoInterface)
+        itf_mock_object = interface_mock()
         sensor.bind_serial(itf_mock_object)
 
-        itf_mock_object.execute_command.side_effect = self.callback_execute_cmd_nodeparaget
+        itf_mock_object.execute_commands.side_effect = self.callback_execute_cmds_nodeparaget
         sensor.sample()
-        co2_call = call(self.nodeparaget_co2(255))
-        temperature_call = call(self.nodeparaget_temperature(255))
-        itf_mock_object.execute_command.assert_has_calls([co2_call, temperature_call], any_order=True)
+        commands = itf_mock_object.execute_commands.call_args[0][0]
+        self.assertEqual(sorted(commands), sorted([self.nodeparaget_co2(255), self.nodeparaget_temperature(255)]))
 
         self.assertEqual(sensor.get_value(dut.CO2_STR), None)
         self.assertEqual(sensor.get_value(dut.TEMPERATURE_STR), None)
@@ -1,33 +1,28 @@
 from unittest import TestCase
-try:
-    from unittest.mock import MagicMock, patch, call
-except ImportError:
-    from mock import MagicMock, patch, call
 
 import duco.ducobox as dut
+from _mocks import interface_mock
+from _fixtures import read_reply
 
 
 class TestDucoUserControlHumiditySensorBasic(TestCase):
 
-    @patch('duco.ducobox.DucoInterface', autospec=True)
-    def test_happy(self, itf_mock):
+    def test_happy(self):
         sensor = dut.DucoUserControlHumiditySensor(1, 2)
-        itf_mock_object = MagicMock(spec=dut.DucoInterface)
+        itf_mock_object = interface_mock()
         sensor.bind_serial(itf_mock_object)
 
         itf_mock_object.is_extended.return_value = False
-        with open('tests/cmd_sensorinfo.txt') as cmdfile:
-            itf_mock_object.execute_command.return_value = cmdfile.read()
+        itf_mock_object.execute_command.return_value = read_reply('sensorinfo')
         sensor.sample()
         itf_mock_object.execute_command.assert_called_once_with('sensorinfo')
 
         self.assertEqual(sensor.get_value(dut.HUMIDITY_STR), 68.37)
         self.assertEqual(sensor.get_value(dut.TEMPERATURE_STR), 18.9)
 
-    @patch('duco.ducobox.DucoInterface', autospec=True)
-    def test_no_values(self, itf_mock):
+    def test_no_values(self):
         sensor = dut.DucoUserControlHumiditySensor(1, 2)
-        itf_mock_object = MagicMock(spec=dut.DucoInterface)
+        itf_mock_object = interface_mock()
         sensor.bind_serial(itf_mock_object)
 
         itf_mock_object.is_extended.return_value = False
@@ -49,45 +44,44 @@ class TestDucoUserControlHumiditySensorExtended(TestCase):
     def nodeparaget_temperature(self, device):
         return self.node_paraget_cmd.format(device=device, para=dut.TEMPERATURE_PARAGET_ID)
 
+    def setUp(self):
+        self.paraget_replies = {
+            self.nodeparaget_humidity(1): 'paraget_humidity',
+            self.nodeparaget_temperature(1): 'paraget_temperature',
+            self.nodeparaget_humidity(255): 'paraget_failed',
+            self.nodeparaget_temperature(255): 'paraget_failed',
+        }
+
     def callback_execute_cmd_nodeparaget(self, cmd):
-        if cmd == self.nodeparaget_humidity(1):
-            with open('tests/cmd_paraget_humidity.txt') as cmdfile:
-                return cmdfile.read()
-        elif cmd == self.nodeparaget_temperature(1):
-            with open('tests/cmd_paraget_temperature.txt') as cmdfile:
-                return cmdfile.read()
-        elif cmd == self.nodeparaget_humidity(255) or cmd == self.nodeparaget_temperature(255):
-            with open('tests/cmd_paraget_failed.txt') as cmdfile:
-                return cmdfile.read()
-        self.fail('unknown nodeparaget command')
-        return None
-
-    @patch('duco.ducobox.DucoInterface', autospec=True)
-    def test_happy(self, itf_mock):
+        if cmd not in self.paraget_replies:
+            self.fail('unknown nodeparaget command')
+        return read_reply(self.paraget_replies[cmd])
+
+    def callback_execute_cmds_nodeparaget(self, cmds):
+        return [self.callback_execute_cmd_nodeparaget(cmd) for cmd in cmds]
+
+    def test_happy(self):
         sensor = dut.DucoUserControlHumiditySensor(1, 2)
-        itf_mock_object = MagicMock(spec=dut.DucoInterface)
+        itf_mock_object = interface_mock()
         sensor.bind_serial(itf_mock_object)
 
-        itf_mock_object.execute_command.side_effect = self.callback_execute_cmd_nodeparaget
+        itf_mock_object.execute_commands.side_effect = self.callback_execute_cmds_nodeparaget
         sensor.sample()
-        humidity_call = call(self.nodeparaget_humidity(1))
-        temperature_call = call(self.nodeparaget_temperature(1))
-        itf_mock_object.execute_command.assert_has_calls([humidity_call, temperature_call], any_order=True)
+        commands = itf_mock_object.execute_commands.call_args[0][0]
+        self.assertEqual(sorted(commands), sorted([self.nodeparaget_humidity(1), self.nodeparaget_temperature(1)]))
 
         self.assertEqual(sensor.get_value(dut.HUMIDITY_STR), 62.35)
         self.assertEqual(sensor.get_value(dut.TEMPERATURE_STR), 27.5)
 
-    @patch('duco.ducobox.DucoInterface', autospec=True)
-    def test_no_values(self, itf_mock):
+    def test_no_values(self):
         sensor = dut.DucoUserControlHumiditySensor(255, 2)
-        itf_mock_object = MagicMock(spec=dut.DucoInterface)
+        itf_mock_object = interface_mock()
         sensor.bind_serial(itf_mock_object)
 
-        itf_mock_object.execute_command.side_effect = self.callback_execute_cmd_nodeparaget
+        itf_mock_object.execute_commands.side_effect = self.callback_execute_cmds_nodeparaget
         sensor.sample()
-        humidity_call = call(self.nodeparaget_humidity(255))
-        temperature_call = call(self.nodeparaget_temperature(255))
-        itf_mock_object.execute_command.assert_has_calls([humidity_call, temperature_call], any_order=True)
+        commands = itf_mock_object.execute_commands.call_args[0][0]
+        self.assertEqual(sorted(commands), sorted([self.nodeparaget_humidity(255), self.nodeparaget_temperature(255)]))
 
         self.assertEqual(sensor.get_value(dut.HUMIDITY_STR), None)
         self.assertEqual(sensor.get_value(dut.TEMPERATURE_STR), None)
@@ -0,0 +1,28 @@
+from unittest import TestCase
+
+import duco.ducobox as dut
+from _compat import patch
+
+
+class TestInfluxDb(TestCase):
+
+    @patch('duco.ducobox.InfluxDBClient')
+    def test_batched_write(self, client_mock):
+        db = dut.InfluxDb('/tmp/my/mocked_influxdb_config')
+        db.configure('localhost', '8086', 'user', 'password', 'duco')
+        client = client_mock.return_value
+        node = dut.DucoGrille(1, 2)
+
+        db.store_sample(node, dut.TEMPERATURE_STR, 21.5)
+        db.store_sample(node, dut.HUMIDITY_STR, 45.0)
+        client.write_points.assert_not_called()
+
+        db.flush()
+        self.assertEqual(client.write_points.call_count, 1)
+        points = client.write_points.call_args[0][0]
+        self.assertEqual([point['measurement'] for point in points], [dut.TEMPERATURE_STR, dut.HUMIDITY_STR])
+        self.assertEqual(points[0]['tags']['node'], '1')
+        self.assertEqual(points[1]['fields']['value'], 45.0)
+
+        db.flush()
+        self.assertEqual(client.write_points.call_count, 1)
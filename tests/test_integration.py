@@ -1,6 +1,7 @@
 from unittest import TestCase
+import logging
 
-from duco.ducobox import ducobox_wrapper
+from duco.ducobox import ducobox_wrapper, set_logging_level
 
 
 class TestIntegration(TestCase):
@@ -28,3 +29,15 @@ class TestIntegration(TestCase):
         with self.assertRaises(SystemExit) as ex:
             ducobox_wrapper(['--port', '/dev/null', '--interval', 'invalid'])
         self.assertEqual(2, ex.exception.code)
+
+    def test_offline(self):
+        self.assertEqual(1, ducobox_wrapper(['--port', '/dev/does/not/exist', '--network', '/dev/does/not/exist', '--startup-timeout', '0']))
+
+    def test_loglevel_applied_twice(self):
+        level = logging.getLogger().level
+        try:
+            set_logging_level('error')
+            set_logging_level('debug')
+            self.assertEqual(logging.DEBUG, logging.getLogger().level)
+        finally:
+            logging.getLogger().setLevel(level)